@@ -4,10 +4,14 @@
 Stripped-down version for local development.
 """
 
+import asyncio
+import functools
 import os
-from typing import Any, Dict
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 from conversation_config import CONVERSATION_CONFIG
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -40,8 +44,6 @@ from pipecat.processors.frameworks.rtvi import (
     RTVIServerMessageFrame,
 )
 from pipecat.runner.types import SmallWebRTCRunnerArguments
-from pipecat.services.openai.llm import OpenAILLMService
-from pipecat.services.azure.llm import AzureLLMService
 from pipecat.transports.base_transport import TransportParams
 from pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
 from pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
@@ -55,115 +57,300 @@ from pipecat_flows import (
     NodeConfig,
 )
 
-# Load environment variables from .env next to this script (not cwd)
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"), override=True)
+# Parse .env next to this script (not cwd) once, without touching os.environ
+_DOTENV = dotenv_values(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
-# Store active peer connections
-pcs_map: Dict[str, Any] = {}
 
+def env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a setting from .env, falling back to the process environment."""
+    return _DOTENV.get(key) or os.environ.get(key, default)
 
-# ============= STT/TTS Service Factories =============
 
+# Store active peer connections. Weak references, so connections whose bot
+# pipeline has finished are dropped even if the "closed" event never fires.
+pcs_map: "weakref.WeakValueDictionary[str, SmallWebRTCConnection]" = weakref.WeakValueDictionary()
 
-def create_llm_service():
-    """Create LLM service based on LLM_PROVIDER env var. Default: openai."""
-    provider = os.getenv("LLM_PROVIDER", "openai").lower()
-
-    if provider == "azure":
-        return AzureLLMService(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            model=os.getenv("AZURE_OPENAI_MODEL", "gpt-4o-mini"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-01-preview"),
-        )
 
-    elif provider == "openai":
-        return OpenAILLMService(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        )
+# ============= Service Configuration =============
 
-    else:
-        raise ValueError(f"Unsupported LLM provider: {provider}. Supported: openai, azure")
 
+@dataclass(frozen=True, slots=True)
+class ServiceConfig:
+    """Provider selection and credentials, read from the environment once."""
 
-def create_stt_service():
-    """Create STT service based on STT_PROVIDER env var."""
-    provider = os.getenv("STT_PROVIDER", "azure").lower()
+    llm_provider: str
+    stt_provider: str
+    tts_provider: str
 
-    if provider == "azure":
-        from pipecat.services.azure.stt import AzureSTTService
-        return AzureSTTService(
-            api_key=os.getenv("AZURE_SPEECH_API_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION"),
-        )
+    openai_api_key: Optional[str]
+    openai_model: str
+    openai_tts_voice: str
 
-    elif provider == "deepgram":
-        from pipecat.services.deepgram.stt import DeepgramSTTService
-        return DeepgramSTTService(
-            api_key=os.getenv("DEEPGRAM_API_KEY"),
-        )
+    azure_openai_api_key: Optional[str]
+    azure_openai_endpoint: Optional[str]
+    azure_openai_model: str
+    azure_openai_api_version: str
+
+    azure_speech_api_key: Optional[str]
+    azure_speech_region: Optional[str]
+    azure_tts_voice: str
+
+    deepgram_api_key: Optional[str]
+    deepgram_tts_voice: str
 
-    elif provider == "openai":
-        from pipecat.services.openai.stt import OpenAISTTService
-        return OpenAISTTService(
-            api_key=os.getenv("OPENAI_API_KEY"),
+    elevenlabs_api_key: Optional[str]
+    elevenlabs_voice_id: str
+
+    @classmethod
+    def from_env(cls) -> "ServiceConfig":
+        """Build the config from .env and environment variables (see .env.example)."""
+        return cls(
+            llm_provider=env("LLM_PROVIDER", "openai").lower(),
+            stt_provider=env("STT_PROVIDER", "azure").lower(),
+            tts_provider=env("TTS_PROVIDER", "azure").lower(),
+            openai_api_key=env("OPENAI_API_KEY"),
+            openai_model=env("OPENAI_MODEL", "gpt-4o-mini"),
+            openai_tts_voice=env("OPENAI_TTS_VOICE", "alloy"),
+            azure_openai_api_key=env("AZURE_OPENAI_API_KEY"),
+            azure_openai_endpoint=env("AZURE_OPENAI_ENDPOINT"),
+            azure_openai_model=env("AZURE_OPENAI_MODEL", "gpt-4o-mini"),
+            azure_openai_api_version=env("AZURE_OPENAI_API_VERSION", "2024-10-01-preview"),
+            azure_speech_api_key=env("AZURE_SPEECH_API_KEY"),
+            azure_speech_region=env("AZURE_SPEECH_REGION"),
+            azure_tts_voice=env("AZURE_TTS_VOICE", "en-US-GuyNeural"),
+            deepgram_api_key=env("DEEPGRAM_API_KEY"),
+            deepgram_tts_voice=env("DEEPGRAM_TTS_VOICE", "aura-asteria-en"),
+            elevenlabs_api_key=env("ELEVENLABS_API_KEY"),
+            elevenlabs_voice_id=env("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM"),
         )
 
-    else:
-        raise ValueError(f"Unsupported STT provider: {provider}. Supported: azure, deepgram, openai")
+
+CFG = ServiceConfig.from_env()
+
+
+# ============= STT/TTS Service Factories =============
+# Each provider has a small factory that imports its SDK on first use, so only
+# the configured providers are ever loaded. create_*_service() picks the
+# factory from a registry instead of walking an if/elif chain per session.
+
+
+def _azure_llm():
+    from pipecat.services.azure.llm import AzureLLMService
+    return AzureLLMService(
+        api_key=CFG.azure_openai_api_key,
+        endpoint=CFG.azure_openai_endpoint,
+        model=CFG.azure_openai_model,
+        api_version=CFG.azure_openai_api_version,
+    )
+
+
+def _openai_llm():
+    from pipecat.services.openai.llm import OpenAILLMService
+    return OpenAILLMService(
+        api_key=CFG.openai_api_key,
+        model=CFG.openai_model,
+    )
+
+
+def _azure_stt():
+    from pipecat.services.azure.stt import AzureSTTService
+    return AzureSTTService(
+        api_key=CFG.azure_speech_api_key,
+        region=CFG.azure_speech_region,
+    )
+
+
+def _deepgram_stt():
+    from pipecat.services.deepgram.stt import DeepgramSTTService
+    return DeepgramSTTService(
+        api_key=CFG.deepgram_api_key,
+    )
+
+
+def _openai_stt():
+    from pipecat.services.openai.stt import OpenAISTTService
+    return OpenAISTTService(
+        api_key=CFG.openai_api_key,
+    )
+
+
+def _azure_tts():
+    from pipecat.services.azure.tts import AzureTTSService
+    return AzureTTSService(
+        api_key=CFG.azure_speech_api_key,
+        region=CFG.azure_speech_region,
+        voice=CFG.azure_tts_voice,
+        text_filters=[MarkdownTextFilter()],
+        sample_rate=16000,
+    )
+
+
+def _deepgram_tts():
+    from pipecat.services.deepgram.tts import DeepgramTTSService
+    return DeepgramTTSService(
+        api_key=CFG.deepgram_api_key,
+        voice=CFG.deepgram_tts_voice,
+    )
+
+
+def _openai_tts():
+    from pipecat.services.openai.tts import OpenAITTSService
+    return OpenAITTSService(
+        api_key=CFG.openai_api_key,
+        voice=CFG.openai_tts_voice,
+    )
+
+
+def _elevenlabs_tts():
+    from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
+    return ElevenLabsTTSService(
+        api_key=CFG.elevenlabs_api_key,
+        voice_id=CFG.elevenlabs_voice_id,
+    )
+
+
+_LLM_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "openai": _openai_llm,
+    "azure": _azure_llm,
+}
+
+_STT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "azure": _azure_stt,
+    "deepgram": _deepgram_stt,
+    "openai": _openai_stt,
+}
+
+_TTS_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "azure": _azure_tts,
+    "deepgram": _deepgram_tts,
+    "openai": _openai_tts,
+    "elevenlabs": _elevenlabs_tts,
+}
+
+
+def create_llm_service():
+    """Create LLM service based on LLM_PROVIDER env var. Default: openai."""
+    provider = CFG.llm_provider
+    factory = _LLM_FACTORIES.get(provider)
+    if factory is None:
+        raise ValueError(f"Unsupported LLM provider: {provider}. Supported: {', '.join(_LLM_FACTORIES)}")
+    return factory()
+
+
+def create_stt_service():
+    """Create STT service based on STT_PROVIDER env var."""
+    provider = CFG.stt_provider
+    factory = _STT_FACTORIES.get(provider)
+    if factory is None:
+        raise ValueError(f"Unsupported STT provider: {provider}. Supported: {', '.join(_STT_FACTORIES)}")
+    return factory()
 
 
 def create_tts_service():
     """Create TTS service based on TTS_PROVIDER env var."""
-    provider = os.getenv("TTS_PROVIDER", "azure").lower()
-
-    if provider == "azure":
-        from pipecat.services.azure.tts import AzureTTSService
-        return AzureTTSService(
-            api_key=os.getenv("AZURE_SPEECH_API_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION"),
-            voice=os.getenv("AZURE_TTS_VOICE", "en-US-GuyNeural"),
-            text_filters=[MarkdownTextFilter()],
-            sample_rate=16000,
-        )
+    provider = CFG.tts_provider
+    factory = _TTS_FACTORIES.get(provider)
+    if factory is None:
+        raise ValueError(f"Unsupported TTS provider: {provider}. Supported: {', '.join(_TTS_FACTORIES)}")
+    return factory()
+
+
+# Static part of every conversation_state_update message, shared across updates
+_STATIC_STATE = {
+    # Message type identifier (used by frontend to route different message types)
+    "type": "conversation_state_update",
+    # All available topics (static list; tuples serialize to JSON arrays)
+    "all_topics": tuple(CONVERSATION_CONFIG["topics"]),
+}
 
-    elif provider == "deepgram":
-        from pipecat.services.deepgram.tts import DeepgramTTSService
-        return DeepgramTTSService(
-            api_key=os.getenv("DEEPGRAM_API_KEY"),
-            voice=os.getenv("DEEPGRAM_TTS_VOICE", "aura-asteria-en"),
-        )
+# Denominator of the "N/M" progress indicator (topic list is static)
+_TOTAL_TOPICS = len(CONVERSATION_CONFIG["topics"])
 
-    elif provider == "openai":
-        from pipecat.services.openai.tts import OpenAITTSService
-        return OpenAITTSService(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            voice=os.getenv("OPENAI_TTS_VOICE", "alloy"),
-        )
 
-    elif provider == "elevenlabs":
-        from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
-        return ElevenLabsTTSService(
-            api_key=os.getenv("ELEVENLABS_API_KEY"),
-            voice_id=os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM"),
-        )
+@dataclass
+class CourseSession:
+    """Conversation state for one connected client.
 
-    else:
-        raise ValueError(f"Unsupported TTS provider: {provider}. Supported: azure, deepgram, openai, elevenlabs")
-
-# Conversation state storage (topic list comes from conversation_config.py)
-course_data = {
-    "all_topics": CONVERSATION_CONFIG["topics"],
-    "discussed_topics": [],
-    "responses": {},
-    "current_topics": [],
-    "current_node": "initial",
-}
+    Each run_bot() call creates its own session, so concurrent WebRTC clients
+    don't share topic progress. Flow handlers reach it through
+    flow_manager.state["course_session"].
+    """
+
+    # All available topics (topic list comes from conversation_config.py)
+    all_topics: tuple
+    # Topics in the order they were discussed (sent to the UI)
+    discussed_topics: list = field(default_factory=list)
+    # Same topics as a set, for O(1) membership checks
+    discussed_set: set = field(default_factory=set)
+    # Kept in sync with discussed_topics so readers don't rescan all_topics
+    remaining_topics: list = field(init=False)
+    responses: dict = field(default_factory=dict)
+    current_topics: list = field(default_factory=list)
+    current_node: str = "initial"
+    # Bumped on every state mutation so processors can skip unchanged updates
+    version: int = 0
+    # Pipeline task used by flow handlers to queue frames (set in run_bot)
+    task: Optional[PipelineTask] = None
+
+    def __post_init__(self):
+        self.remaining_topics = list(self.all_topics)
+
+    def reset(self):
+        """Start the conversation over (e.g., when a client connects)."""
+        self.discussed_topics = []
+        self.discussed_set = set()
+        self.remaining_topics = list(self.all_topics)
+        self.responses = {}
+        self.current_topics = []
+        self.current_node = "initial"
+        self.version += 1
+
+
+def _build_state_payload(session: CourseSession) -> dict:
+    """Build the conversation_state_update message sent to the frontend.
+
+    Args:
+        session: Conversation state of the connected client.
+
+    Returns:
+        The RTVI server message payload.
+    """
+    return {
+        **_STATIC_STATE,
+
+        # Topics user has already asked about
+        "discussed_topics": session.discussed_topics,
+
+        # Topics not yet discussed
+        "remaining_topics": session.remaining_topics,
+
+        # Topics currently being discussed (array, usually 1 item)
+        "current_topics": session.current_topics,
+
+        # User interaction metadata per topic (e.g., {topic_name: {interested: true}})
+        "responses": session.responses,
+
+        # Current position in the conversation flow (e.g., "initial", "questions")
+        "current_node": session.current_node,
+
+        # Progress indicator for UI (e.g., "2/3")
+        "progress": f"{len(session.discussed_topics)}/{_TOTAL_TOPICS}",
+    }
 
 
 # ============= Custom Frame Processors =============
 
+# Seconds to wait before sending a state update, so bursts become one message
+STATE_UPDATE_DELAY = 0.05
+
+# Frame types that trigger a state update. process_frame sees every frame in the
+# pipeline, so the isinstance result is cached per concrete frame type and the
+# common miss case becomes a single dict lookup.
+_STATE_TRIGGER_FRAMES = (LLMFullResponseEndFrame, FunctionCallResultFrame)
+_state_trigger_types: Dict[type, bool] = {
+    frame_type: True for frame_type in _STATE_TRIGGER_FRAMES
+}
+
 
 class ConversationStateProcessor(FrameProcessor):
     """Sends conversation state updates to the frontend via RTVI messages.
@@ -177,57 +364,56 @@ class ConversationStateProcessor(FrameProcessor):
     onServerMessage callback, triggering UI updates (topic cards ⭕ → ✅).
     """
 
-    def __init__(self, course_data: dict):
+    def __init__(self, session: CourseSession):
         """Initialize the course state processor.
 
         Args:
-            course_data: Dictionary containing course state (topics, responses, etc.).
+            session: Conversation state of the connected client (topics, responses, etc.).
         """
         super().__init__()
-        self.course_data = course_data
-        self.last_sent_state: Dict[str, Any] = {}
+        self.session = session
+        # (version, current_node) of the last update sent to the frontend
+        self._last_key: Optional[tuple] = None
+        self._pending_update: Optional[asyncio.Task] = None
 
     async def send_state_update(self):
-        """Send course state update via RTVIServerMessageFrame."""
-        remaining = [
-            t
-            for t in self.course_data["all_topics"]
-            if t not in self.course_data["discussed_topics"]
-        ]
-
-        current_state = {
-            # Message type identifier (used by frontend to route different message types)
-            "type": "conversation_state_update",
-
-            # All available topics (static list)
-            "all_topics": self.course_data["all_topics"],
-
-            # Topics user has already asked about
-            "discussed_topics": self.course_data["discussed_topics"],
+        """Schedule a course state update via RTVIServerMessageFrame.
 
-            # Topics not yet discussed
-            "remaining_topics": remaining,
-
-            # Topics currently being discussed (array, usually 1 item)
-            "current_topics": self.course_data.get("current_topics", []),
-
-            # User interaction metadata per topic (e.g., {topic_name: {interested: true}})
-            "responses": self.course_data["responses"],
-
-            # Current position in the conversation flow (e.g., "initial", "questions")
-            "current_node": self.course_data.get("current_node", "initial"),
-
-            # Progress indicator for UI (e.g., "2/3")
-            "progress": f"{len(self.course_data['discussed_topics'])}/{len(self.course_data['all_topics'])}",
-        }
+        A function call and the LLM response that follows it arrive in quick
+        succession, so updates requested within STATE_UPDATE_DELAY of each
+        other are coalesced into a single message.
+        """
+        if self._pending_update and not self._pending_update.done():
+            return
+        self._pending_update = self.create_task(self._flush_state_update())
+
+    async def cancel_state_update(self):
+        """Cancel a scheduled state update (e.g., when the client disconnects)."""
+        if self._pending_update and not self._pending_update.done():
+            await self.cancel_task(self._pending_update)
+        self._pending_update = None
+
+    async def cleanup(self):
+        """Cancel any scheduled state update when the pipeline shuts down."""
+        await self.cancel_state_update()
+        await super().cleanup()
+
+    async def _flush_state_update(self):
+        """Send the state update after the coalescing delay.
+
+        Skipped when neither the state version nor the flow node has changed
+        since the last update.
+        """
+        await asyncio.sleep(STATE_UPDATE_DELAY)
 
-        state_changed = current_state != self.last_sent_state or current_state.get(
-            "current_node"
-        ) != self.last_sent_state.get("current_node")
+        key = (self.session.version, self.session.current_node)
+        if key == self._last_key:
+            return
 
-        if state_changed:
-            await self.push_frame(RTVIServerMessageFrame(data=current_state))
-            self.last_sent_state = current_state.copy()
+        await self.push_frame(
+            RTVIServerMessageFrame(data=_build_state_payload(self.session))
+        )
+        self._last_key = key
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         """Process pipeline frames and send state updates to frontend.
@@ -242,7 +428,13 @@ class ConversationStateProcessor(FrameProcessor):
         await super().process_frame(frame, direction)
 
         # Send state update after LLM responses and function calls
-        if isinstance(frame, (LLMFullResponseEndFrame, FunctionCallResultFrame)):
+        frame_type = type(frame)
+        is_trigger = _state_trigger_types.get(frame_type)
+        if is_trigger is None:
+            is_trigger = issubclass(frame_type, _STATE_TRIGGER_FRAMES)
+            _state_trigger_types[frame_type] = is_trigger
+
+        if is_trigger:
             await self.send_state_update()
 
         await self.push_frame(frame, direction)
@@ -250,6 +442,40 @@ class ConversationStateProcessor(FrameProcessor):
 
 # ============= Flow Node Definitions =============
 
+# Node messages are static, so build them once at import instead of on every
+# transition. Pipecat Flows only reads these lists, so nodes can share them.
+_INITIAL_ROLE_MESSAGES = [
+    {
+        "role": "system",
+        "content": CONVERSATION_CONFIG["initial_node"]["role_prompt"],
+    }
+]
+_INITIAL_TASK_MESSAGES = [
+    {
+        "role": "system",
+        "content": CONVERSATION_CONFIG["initial_node"]["task_prompt"],
+    }
+]
+
+# Combine role prompt with course details
+_QUESTIONS_FULL_PROMPT = (
+    f"{CONVERSATION_CONFIG['questions_node']['role_prompt']}"
+    f"\n\nFULL COURSE DETAILS:\n\n"
+    f"{CONVERSATION_CONFIG['questions_node']['course_details']}"
+)
+_QUESTIONS_ROLE_MESSAGES = [
+    {
+        "role": "system",
+        "content": _QUESTIONS_FULL_PROMPT,
+    }
+]
+_QUESTIONS_TASK_MESSAGES = [
+    {
+        "role": "system",
+        "content": CONVERSATION_CONFIG["questions_node"]["task_prompt"],
+    }
+]
+
 
 def create_go_back_function() -> FlowsFunctionSchema:
     """Create a function to go back to topic selection."""
@@ -258,28 +484,16 @@ def create_go_back_function() -> FlowsFunctionSchema:
         args: FlowArgs, flow_manager: FlowManager
     ) -> tuple[str | None, NodeConfig]:
         """Handle user wanting to go back to topic selection."""
-        course_data["current_node"] = "initial"
-
-        if hasattr(flow_manager, "_task") and flow_manager._task:
-            frame = RTVIServerMessageFrame(
-                data={
-                    "type": "conversation_state_update",
-                    "all_topics": course_data["all_topics"],
-                    "discussed_topics": course_data["discussed_topics"],
-                    "responses": course_data["responses"],
-                    "remaining_topics": [
-                        t
-                        for t in course_data["all_topics"]
-                        if t not in course_data["discussed_topics"]
-                    ],
-                    "current_topics": [],
-                    "current_node": "initial",
-                    "progress": f"{len(course_data['discussed_topics'])}/{len(course_data['all_topics'])}",
-                }
-            )
-            await flow_manager._task.queue_frame(frame)
+        session: CourseSession = flow_manager.state["course_session"]
+        session.current_topics = []
+        session.current_node = "initial"
+        session.version += 1
 
-        return None, create_initial_node()
+        if session.task is not None:
+            frame = RTVIServerMessageFrame(data=_build_state_payload(session))
+            await session.task.queue_frame(frame)
+
+        return None, create_initial_node(session)
 
     return FlowsFunctionSchema(
         name="go_back_to_topics",
@@ -299,7 +513,8 @@ def create_exit_function() -> FlowsFunctionSchema:
         args: FlowArgs, flow_manager: FlowManager
     ) -> tuple[str | None, NodeConfig]:
         """Handle user wanting to exit the conversation."""
-        count_discussed = len(course_data.get("discussed_topics", []))
+        session: CourseSession = flow_manager.state["course_session"]
+        count_discussed = len(session.discussed_topics)
         logger.info(
             f"User exiting conversation after discussing {count_discussed} course topics"
         )
@@ -333,15 +548,27 @@ def create_exit_function() -> FlowsFunctionSchema:
     )
 
 
-def create_dynamic_topic_function() -> FlowsFunctionSchema:
-    """Generate function with dynamic enum based on remaining topics."""
-    remaining = [
-        t for t in course_data["all_topics"] if t not in course_data["discussed_topics"]
-    ]
+# go_back and exit don't depend on session state (handlers read it from
+# flow_manager.state), so every Q&A node shares the same two schemas
+_GO_BACK_SCHEMA = create_go_back_function()
+_EXIT_SCHEMA = create_exit_function()
 
-    if not remaining:
+
+def create_dynamic_topic_function(session: CourseSession) -> FlowsFunctionSchema:
+    """Generate function with dynamic enum based on remaining topics."""
+    if not session.remaining_topics:
         return None
 
+    return _topic_schema(frozenset(session.remaining_topics))
+
+
+# Only the remaining-topic sets a conversation actually reaches are cached, and
+# each schema (enum list, joined description) is built exactly once
+@functools.lru_cache(maxsize=None)
+def _topic_schema(remaining_set: frozenset) -> FlowsFunctionSchema:
+    """Build the record_topic_interest schema for one set of remaining topics."""
+    remaining = [t for t in CONVERSATION_CONFIG["topics"] if t in remaining_set]
+
     # Get description from config (dynamically generated with current topics)
     description_generator = CONVERSATION_CONFIG["functions"]["topic_function_description"]
     description = description_generator(remaining)
@@ -361,25 +588,13 @@ def create_dynamic_topic_function() -> FlowsFunctionSchema:
     )
 
 
-def create_initial_node() -> NodeConfig:
+def create_initial_node(session: CourseSession) -> NodeConfig:
     """Create the initial node - welcome, then go to Q&A."""
-    config = CONVERSATION_CONFIG["initial_node"]
-
     return {
         "name": "initial",
-        "role_messages": [
-            {
-                "role": "system",
-                "content": config["role_prompt"],
-            }
-        ],
-        "task_messages": [
-            {
-                "role": "system",
-                "content": config["task_prompt"],
-            }
-        ],
-        "functions": [create_dynamic_topic_function()],
+        "role_messages": _INITIAL_ROLE_MESSAGES,
+        "task_messages": _INITIAL_TASK_MESSAGES,
+        "functions": [create_dynamic_topic_function(session)],
         "respond_immediately": True,
     }
 
@@ -388,33 +603,23 @@ async def process_topic_interest(
     args: FlowArgs, flow_manager: FlowManager
 ) -> tuple[str | None, NodeConfig]:
     """Mark topic as discussed and go to Q&A mode."""
+    session: CourseSession = flow_manager.state["course_session"]
     topic = args["topics"][0]
 
-    if topic not in course_data["discussed_topics"]:
-        course_data["responses"][topic] = {"interested": True}
-        course_data["discussed_topics"].append(topic)
-
-    course_data["current_topics"] = [topic]
-    course_data["current_node"] = "questions"
-
-    remaining = [
-        m for m in course_data["all_topics"] if m not in course_data["discussed_topics"]
-    ]
-
-    if hasattr(flow_manager, "_task") and flow_manager._task:
-        frame = RTVIServerMessageFrame(
-            data={
-                "type": "conversation_state_update",
-                "all_topics": course_data["all_topics"],
-                "discussed_topics": course_data["discussed_topics"],
-                "responses": course_data["responses"],
-                "remaining_topics": remaining,
-                "current_topics": [topic],
-                "current_node": "questions",
-                "progress": f"{len(course_data['discussed_topics'])}/{len(course_data['all_topics'])}",
-            }
-        )
-        await flow_manager._task.queue_frame(frame)
+    if topic not in session.discussed_set:
+        session.responses[topic] = {"interested": True}
+        session.discussed_set.add(topic)
+        session.discussed_topics.append(topic)
+        if topic in session.remaining_topics:
+            session.remaining_topics.remove(topic)
+
+    session.current_topics = [topic]
+    session.current_node = "questions"
+    session.version += 1
+
+    if session.task is not None:
+        frame = RTVIServerMessageFrame(data=_build_state_payload(session))
+        await session.task.queue_frame(frame)
         logger.info(f"Course: Marked {topic} as discussed, going to Q&A")
 
     return None, create_questions_node()
@@ -422,26 +627,11 @@ async def process_topic_interest(
 
 def create_questions_node() -> NodeConfig:
     """Q&A node where users can ask detailed questions."""
-    config = CONVERSATION_CONFIG["questions_node"]
-
-    # Combine role prompt with course details
-    full_prompt = f"{config['role_prompt']}\n\nFULL COURSE DETAILS:\n\n{config['course_details']}"
-
     return {
         "name": "questions",
-        "role_messages": [
-            {
-                "role": "system",
-                "content": full_prompt,
-            }
-        ],
-        "task_messages": [
-            {
-                "role": "system",
-                "content": config["task_prompt"],
-            }
-        ],
-        "functions": [create_go_back_function(), create_exit_function()],
+        "role_messages": _QUESTIONS_ROLE_MESSAGES,
+        "task_messages": _QUESTIONS_TASK_MESSAGES,
+        "functions": [_GO_BACK_SCHEMA, _EXIT_SCHEMA],
         "respond_immediately": True,
     }
 
@@ -482,8 +672,11 @@ async def run_bot(runner_args: SmallWebRTCRunnerArguments):
     # RTVI processor for frontend communication
     rtvi = RTVIProcessor(config=RTVIConfig(config=[]), transport=transport)
 
+    # Per-connection conversation state (not shared between clients)
+    session = CourseSession(all_topics=tuple(CONVERSATION_CONFIG["topics"]))
+
     # Course state processor — sends flow state to frontend
-    course_state_processor = ConversationStateProcessor(course_data)
+    course_state_processor = ConversationStateProcessor(session)
 
     # Pipeline: audio in -> STT -> mute filter -> LLM -> state updates -> TTS -> audio out
     pipeline = Pipeline(
@@ -513,19 +706,19 @@ async def run_bot(runner_args: SmallWebRTCRunnerArguments):
         context_aggregator=context_aggregator,
         transport=transport,
     )
+    session.task = task
+    flow_manager.state["course_session"] = session
 
     @transport.event_handler("on_client_connected")
     async def on_client_connected(transport, _client):
         logger.info("Client connected - starting course flow")
-        course_data["discussed_topics"] = []
-        course_data["responses"] = {}
-        course_data["current_topics"] = []
-        course_data["current_node"] = "initial"
-        await flow_manager.initialize(create_initial_node())
+        session.reset()
+        await flow_manager.initialize(create_initial_node(session))
 
     @transport.event_handler("on_client_disconnected")
     async def on_client_disconnected(transport, _client):
         logger.info("Client disconnected")
+        await course_state_processor.cancel_state_update()
 
     @rtvi.event_handler("on_client_ready")
     async def on_client_ready(rtvi):
@@ -566,9 +759,9 @@ async def start(request: dict, background_tasks: BackgroundTasks):
 async def offer(request: dict, background_tasks: BackgroundTasks):
     """Handle WebRTC offer and start the bot pipeline."""
     pc_id = request.get("pc_id")
+    pipecat_connection = pcs_map.get(pc_id) if pc_id else None
 
-    if pc_id and pc_id in pcs_map:
-        pipecat_connection = pcs_map[pc_id]
+    if pipecat_connection is not None:
         await pipecat_connection.renegotiate(
             sdp=request["sdp"],
             type=request["type"],
@@ -602,6 +795,6 @@ if os.path.exists("/app/static/index.html"):
 if __name__ == "__main__":
     import uvicorn
 
-    port = int(os.getenv("PORT", "8000"))
+    port = int(env("PORT", "8000"))
     logger.info(f"Starting server on http://0.0.0.0:{port}")
     uvicorn.run(app, host="0.0.0.0", port=port)